@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Annotated, Literal
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
@@ -153,6 +155,23 @@ def tool_node(state: AgentState) -> AgentState:
     return {"messages": results}
 
 
+async def parallel_tool_node(state: AgentState) -> AgentState:
+    """Run every tool call from the latest AI turn concurrently and return the ToolMessages in call order."""
+    last = state["messages"][-1]
+    if not isinstance(last, AIMessage) or not last.tool_calls:
+        return {"messages": []}
+
+    # Tools are sync (CSV / index I/O); ainvoke runs each one in the default executor
+    outputs = await asyncio.gather(
+        *(TOOLS[call["name"]].ainvoke(call.get("args", {})) for call in last.tool_calls)
+    )
+    results = [
+        ToolMessage(content=str(output), tool_call_id=call["id"], name=call["name"])
+        for call, output in zip(last.tool_calls, outputs)
+    ]
+    return {"messages": results}
+
+
 def route_after_agent(state: AgentState) -> Literal["tools", "end"]:
     last = state["messages"][-1]
     if isinstance(last, AIMessage) and last.tool_calls:
@@ -163,7 +182,8 @@ def route_after_agent(state: AgentState) -> Literal["tools", "end"]:
 def build_graph():
     g = StateGraph(AgentState)
     g.add_node("agent", agent_node)
-    g.add_node("tools", tool_node)
+    # Sync invoke() runs tool_node; ainvoke() fans the calls out concurrently
+    g.add_node("tools", RunnableLambda(tool_node, afunc=parallel_tool_node))
     g.set_entry_point("agent")
     g.add_conditional_edges("agent", route_after_agent, {"tools": "tools", "end": END})
     g.add_edge("tools", "agent")
@@ -172,5 +192,5 @@ def build_graph():
 
 if __name__ == "__main__":
     app = build_graph()
-    result = app.invoke({"messages": [HumanMessage(content="Evaluate Day-1 readiness for EMP1001")]})
+    result = asyncio.run(app.ainvoke({"messages": [HumanMessage(content="Evaluate Day-1 readiness for EMP1001")]}))
     print(result["messages"][-1].content)
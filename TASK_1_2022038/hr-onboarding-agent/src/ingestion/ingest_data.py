@@ -11,21 +11,27 @@ Author: HR Onboarding Agent Project
 """
 
 import os
-import json
+import orjson
 import re
+import hashlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import numpy as np
 import pandas as pd
-from pypdf import PdfReader
+import fitz  # PyMuPDF
 import chromadb
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import HuggingFaceEmbeddings
+from sentence_transformers import SentenceTransformer
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
 # ─────────────────────────────────────────────
 # HARDCODED METADATA MAP based on actual PDF content
 # ─────────────────────────────────────────────
@@ -76,12 +82,82 @@ LOW_PRIORITY_KEYWORDS = [
     "appendix", "acknowledgment", "reference", "bibliography"
 ]
 
+# One case-insensitive alternation per list — a single scan per chunk
+_RE_HIGH_PRIORITY = re.compile("|".join(re.escape(kw) for kw in HIGH_PRIORITY_KEYWORDS), re.IGNORECASE)
+_RE_LOW_PRIORITY = re.compile("|".join(re.escape(kw) for kw in LOW_PRIORITY_KEYWORDS), re.IGNORECASE)
+
+
+# ─────────────────────────────────────────────
+# TEXT CLEANING
+# ─────────────────────────────────────────────
+# Compiled once at import — clean_text runs on every extracted PDF.
+# All noise patterns share one alternation so the text is scanned once;
+# the named group that matched decides the replacement.
+_RE_NOISE = re.compile(
+    r'(?P<ff>\x0c)'
+    r'|(?P<header>SHRM HUMAN RESOURCE CURRICULUM GUIDEBOOK.*?PROGRAMS\s*\d*'
+    r'|201[78] SHRM Guide to Public Policy Issues\s*\d*)'
+    r'|(?P<copyright>©\d{4}.*?reserved\.)'
+    r'|(?P<number>\n\s*\d{1,3}\s*\n)'
+    r'|(?P<page>Page \d+)'
+    r'|(?P<url>https?://\S+|www\.\S+)'
+)
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# Separators become a space; everything else is dropped
+_NOISE_REPLACEMENTS = {"ff": " ", "number": " "}
+
+
+def _replace_noise(match: re.Match) -> str:
+    return _NOISE_REPLACEMENTS.get(match.lastgroup, "")
+
+
+def clean_text(text: str) -> str:
+    """
+    Strip noise from PDF-extracted text:
+    - Remove page numbers (Page 1, Page 2)
+    - Remove SHRM headers/footers that repeat on every page
+    - Remove excessive whitespace and newlines
+    - Remove PDF form-feed characters
+    - Remove URL-only lines
+    """
+    # Remove form feeds, SHRM headers/footers, page numbers and URLs in one pass
+    text = _RE_NOISE.sub(_replace_noise, text)
+
+    # Collapse whitespace (newlines included) to single spaces
+    text = _RE_WHITESPACE.sub(' ', text)
+
+    # Strip leading/trailing whitespace
+    text = text.strip()
+
+    return text
+
+
+# ─────────────────────────────────────────────
+# PDF EXTRACTION
+# ─────────────────────────────────────────────
+def extract_pdf_content(pdf_path: str) -> str:
+    """
+    Extract and clean text from PDF file.
+    Module-level (not a method) so it can be shipped to ProcessPoolExecutor workers.
+    """
+    try:
+        # PyMuPDF parses in C and returns each page's text in one call
+        with fitz.open(pdf_path) as doc:
+            full_text = "\n".join(page.get_text("text") for page in doc)
+        return clean_text(full_text)
+    except Exception as e:
+        print(f"  ⚠️  Error reading {pdf_path}: {e}")
+        return ""
+
 
 class OnboardingDataIngestor:
     def __init__(self, data_dir: str = "data", output_dir: str = "output"):
         self.data_dir = data_dir
         self.output_dir = output_dir
-        self.chunks = []
+        # Chunk store as parallel lists (struct-of-arrays): documents[i] <-> metadatas[i]
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
 
         # Create output directory if it doesn't exist
         os.makedirs(f"{output_dir}/chroma_db", exist_ok=True)
@@ -91,67 +167,26 @@ class OnboardingDataIngestor:
             path=f"{output_dir}/chroma_db"
         )
 
-        # Initialize OpenAI embeddings
-        # Initialize local HuggingFace embeddings (runs offline)
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2"
-        )
+        # Initialize local SentenceTransformer model (runs offline)
+        self.model = SentenceTransformer(EMBEDDING_MODEL)
+
+        # On-disk embedding cache keyed by (sha256(content), model)
+        self.embedding_cache_path = f"{output_dir}/embedding_cache.sqlite"
+        with sqlite3.connect(self.embedding_cache_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "hash TEXT, model TEXT, vector BLOB, PRIMARY KEY (hash, model))"
+            )
         print("✅ ChromaDB and Embeddings initialized")
 
     # ─────────────────────────────────────────────
-    # TEXT CLEANING
+    # TEXT CLEANING / PDF EXTRACTION
     # ─────────────────────────────────────────────
     def clean_text(self, text: str) -> str:
-        """
-        Strip noise from PDF-extracted text:
-        - Remove page numbers (Page 1, Page 2)
-        - Remove SHRM headers/footers that repeat on every page
-        - Remove excessive whitespace and newlines
-        - Remove PDF form-feed characters
-        - Remove URL-only lines
-        """
-        # Remove form feed characters (PDF page breaks)
-        text = re.sub(r'\x0c', ' ', text)
-
-        # Remove repeating SHRM header/footer lines
-        text = re.sub(r'SHRM HUMAN RESOURCE CURRICULUM GUIDEBOOK.*?PROGRAMS\s*\d*', '', text)
-        text = re.sub(r'2018 SHRM Guide to Public Policy Issues\s*\d*', '', text)
-        text = re.sub(r'2017 SHRM Guide to Public Policy Issues\s*\d*', '', text)
-        text = re.sub(r'©\d{4}.*?reserved\.', '', text)
-
-        # Remove standalone page numbers
-        text = re.sub(r'\n\s*\d{1,3}\s*\n', '\n', text)
-        text = re.sub(r'Page \d+', '', text)
-
-        # Remove URLs (but keep context around them)
-        text = re.sub(r'https?://\S+', '', text)
-        text = re.sub(r'www\.\S+', '', text)
-
-        # Remove excessive whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        return clean_text(text)
 
-        # Strip leading/trailing whitespace
-        text = text.strip()
-
-        return text
-
-    # ─────────────────────────────────────────────
-    # PDF EXTRACTION
-    # ─────────────────────────────────────────────
     def extract_pdf_content(self, pdf_path: str) -> str:
-        """Extract and clean text from PDF file"""
-        try:
-            reader = PdfReader(pdf_path)
-            full_text = ""
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += page_text + "\n"
-            return self.clean_text(full_text)
-        except Exception as e:
-            print(f"  ⚠️  Error reading {pdf_path}: {e}")
-            return ""
+        return extract_pdf_content(pdf_path)
 
     # ─────────────────────────────────────────────
     # METADATA HELPERS
@@ -183,10 +218,9 @@ class OnboardingDataIngestor:
         Override base priority per chunk based on content keywords.
         Allows chunk-level priority even within a single document.
         """
-        content_lower = content.lower()
-        if any(kw in content_lower for kw in HIGH_PRIORITY_KEYWORDS):
+        if _RE_HIGH_PRIORITY.search(content):
             return "high"
-        elif any(kw in content_lower for kw in LOW_PRIORITY_KEYWORDS):
+        elif _RE_LOW_PRIORITY.search(content):
             return "low"
         return "medium"
 
@@ -215,17 +249,32 @@ class OnboardingDataIngestor:
             "shrm-hr-curriculum-guidelines-3.pdf"
         ]
 
+        available_pdfs = []
         for filename in target_pdfs:
-            filepath = os.path.join(policies_dir, filename)
-
-            if not os.path.exists(filepath):
+            if not os.path.exists(os.path.join(policies_dir, filename)):
                 print(f"  ⚠️  File not found: {filename} — skipping")
                 continue
+            available_pdfs.append(filename)
+
+        if not available_pdfs:
+            return
 
+        # Extract PDFs in parallel — one worker process per document
+        extracted = {}
+        max_workers = min(len(available_pdfs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(extract_pdf_content, os.path.join(policies_dir, filename)): filename
+                for filename in available_pdfs
+            }
+            for future in as_completed(futures):
+                extracted[futures[future]] = future.result()
+
+        # Chunk in target order so chunk ids stay stable across runs
+        for filename in available_pdfs:
             print(f"  📄 Processing: {filename}")
 
-            # Extract text
-            content = self.extract_pdf_content(filepath)
+            content = extracted[filename]
 
             if not content:
                 print(f"  ⚠️  No content extracted from {filename}")
@@ -242,28 +291,33 @@ class OnboardingDataIngestor:
             )
 
             chunks = text_splitter.split_text(content)
-            print(f"     → {len(chunks)} chunks created")
 
-            for i, chunk in enumerate(chunks):
-                # Skip very short chunks (likely headers/page numbers)
-                if len(chunk.strip()) < 50:
-                    continue
+            # Skip very short chunks (likely headers/page numbers) up front so
+            # chunk_index stays dense. The splitter already strips whitespace.
+            valid_chunks = [
+                (chunk, self._infer_chunk_priority(chunk))
+                for chunk in chunks
+                if len(chunk) >= 50
+            ]
+            print(f"     → {len(valid_chunks)} chunks created ({len(chunks) - len(valid_chunks)} short chunks skipped)")
+
+            doc_stem = filename.replace('.pdf', '')
+            ingestion_date = datetime.now().isoformat()
 
+            for i, (chunk, priority) in enumerate(valid_chunks):
                 # Build per-chunk metadata (inherits from doc + chunk-level priority)
                 chunk_metadata = {
                     **base_metadata,
                     "source_file": filename,
                     "chunk_index": i,
-                    "chunk_id": f"{filename.replace('.pdf', '')}_{i}",
-                    "ingestion_date": datetime.now().isoformat(),
+                    "chunk_id": f"{doc_stem}_{i}",
+                    "ingestion_date": ingestion_date,
                     # Override priority at chunk level
-                    "priority_level": self._infer_chunk_priority(chunk)
+                    "priority_level": priority
                 }
 
-                self.chunks.append({
-                    "content": chunk,
-                    "metadata": chunk_metadata
-                })
+                self.documents.append(chunk)
+                self.metadatas.append(chunk_metadata)
 
     # ─────────────────────────────────────────────
     # PROCESS CHECKLISTS
@@ -279,9 +333,10 @@ class OnboardingDataIngestor:
             print(f"  ⚠️  Checklist not found: {checklist_path}")
             return
 
-        with open(checklist_path, 'r') as f:
-            data = json.load(f)
+        with open(checklist_path, 'rb') as f:
+            data = orjson.loads(f.read())
 
+        checklist_count = 0
         for role, role_data in data['roles'].items():
             for task in role_data['tasks']:
                 # Create human-readable text for embedding
@@ -293,23 +348,22 @@ class OnboardingDataIngestor:
                     f"Estimated time: {task['estimated_time_minutes']} minutes."
                 )
 
-                self.chunks.append({
-                    "content": content,
-                    "metadata": {
-                        "doc_type": "checklist",
-                        "source_file": "onboarding_master.json",
-                        "department": task['department'],
-                        "role": role,
-                        "task_id": task['id'],
-                        "priority_level": task['priority'],
-                        "topic": "onboarding_task",
-                        "audience": role.lower().replace(" ", "_"),
-                        "ingestion_date": datetime.now().isoformat(),
-                        "last_updated": datetime.now().isoformat()
-                    }
+                self.documents.append(content)
+                self.metadatas.append({
+                    "doc_type": "checklist",
+                    "source_file": "onboarding_master.json",
+                    "department": task['department'],
+                    "role": role,
+                    "task_id": task['id'],
+                    "priority_level": task['priority'],
+                    "topic": "onboarding_task",
+                    "audience": role.lower().replace(" ", "_"),
+                    "ingestion_date": datetime.now().isoformat(),
+                    "last_updated": datetime.now().isoformat()
                 })
+                checklist_count += 1
 
-        print(f"     → {len([c for c in self.chunks if c['metadata'].get('doc_type') == 'checklist'])} checklist chunks created")
+        print(f"     → {checklist_count} checklist chunks created")
 
     # ─────────────────────────────────────────────
     # PROCESS EMPLOYEE CSV
@@ -325,35 +379,99 @@ class OnboardingDataIngestor:
             print(f"  ⚠️  CSV not found: {csv_path}")
             return
 
-        df = pd.read_csv(csv_path)
+        # keep_default_na=False: blank cells stay "" so every chunk text is a str
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+
+        # Build every chunk text with column-wise string ops (no per-row dispatch)
+        contents = (
+            "New Employee Record: " + df["first_name"] + " " + df["last_name"]
+            + " is joining as a " + df["role"] + " in the " + df["department"] + " department. "
+            + "Start date: " + df["start_date"] + ". "
+            + "Work location: " + df["location"] + ". "
+            + "Employment type: " + df["employment_type"] + ". "
+            + "Reports to manager: " + df["manager_email"] + "."
+        ).tolist()
+        records = df[["department", "employee_id", "role"]].to_dict(orient="records")
+        timestamp = datetime.now().isoformat()
+
+        self.documents.extend(contents)
+        self.metadatas.extend(
+            {
+                "doc_type": "employee_record",
+                "source_file": "employees.csv",
+                **record,
+                "priority_level": "high",
+                "topic": "new_hire_profile",
+                "audience": "hr_coordinator",
+                "ingestion_date": timestamp,
+                "last_updated": timestamp
+            }
+            for record in records
+        )
 
-        for _, row in df.iterrows():
-            content = (
-                f"New Employee Record: {row['first_name']} {row['last_name']} "
-                f"is joining as a {row['role']} in the {row['department']} department. "
-                f"Start date: {row['start_date']}. "
-                f"Work location: {row['location']}. "
-                f"Employment type: {row['employment_type']}. "
-                f"Reports to manager: {row['manager_email']}."
-            )
+        print(f"     → {len(df)} employee records created")
 
-            self.chunks.append({
-                "content": content,
-                "metadata": {
-                    "doc_type": "employee_record",
-                    "source_file": "employees.csv",
-                    "department": row['department'],
-                    "employee_id": str(row['employee_id']),
-                    "role": row['role'],
-                    "priority_level": "high",
-                    "topic": "new_hire_profile",
-                    "audience": "hr_coordinator",
-                    "ingestion_date": datetime.now().isoformat(),
-                    "last_updated": datetime.now().isoformat()
-                }
-            })
+    # ─────────────────────────────────────────────
+    # EMBEDDING CACHE
+    # ─────────────────────────────────────────────
+    def embed_with_cache(self, documents: List[str]) -> Tuple[np.ndarray, int, int]:
+        """
+        Embed documents, reusing vectors from embedding_cache.sqlite for any
+        chunk whose content (and model) is unchanged since the last run.
+        Only the uncached chunks go through the model.
+        Returns (vectors, cached count, embedded count); no printing, since this
+        runs on the background embedding thread.
+        """
+        hashes = [hashlib.sha256(d.encode("utf-8")).hexdigest() for d in documents]
+        vectors = np.empty(
+            (len(documents), self.model.get_sentence_embedding_dimension()),
+            dtype=np.float32
+        )
 
-        print(f"     → {len(df)} employee records created")
+        conn = sqlite3.connect(self.embedding_cache_path)
+        try:
+            # Batch lookup through a temp table instead of one SELECT per chunk
+            conn.execute("CREATE TEMP TABLE wanted (hash TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((h,) for h in hashes))
+            cached = {
+                h: np.frombuffer(v, dtype=np.float32)
+                for h, v in conn.execute(
+                    "SELECT c.hash, c.vector FROM embedding_cache c "
+                    "JOIN wanted w ON c.hash = w.hash WHERE c.model = ?",
+                    (EMBEDDING_MODEL,)
+                )
+            }
+
+            uncached_indices = []
+            for i, h in enumerate(hashes):
+                if h in cached:
+                    vectors[i] = cached[h]
+                else:
+                    uncached_indices.append(i)
+
+            if uncached_indices:
+                uncached_texts = [documents[i] for i in uncached_indices]
+                new_vectors = self.model.encode(
+                    uncached_texts,
+                    batch_size=128,
+                    show_progress_bar=False,
+                    normalize_embeddings=True,
+                    convert_to_numpy=True
+                ).astype(np.float32)
+                vectors[uncached_indices] = new_vectors
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (hash, model, vector) VALUES (?, ?, ?)",
+                    (
+                        (hashes[i], EMBEDDING_MODEL, new_vectors[j].tobytes())
+                        for j, i in enumerate(uncached_indices)
+                    )
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+        return vectors, len(documents) - len(uncached_indices), len(uncached_indices)
 
     # ─────────────────────────────────────────────
     # LOAD TO CHROMADB
@@ -361,8 +479,8 @@ class OnboardingDataIngestor:
     def load_to_vectordb(self):
         """
         Embed all chunks and load into ChromaDB collection.
-        Uses OpenAI text-embedding-3-small for vectorization.
-        Batches to avoid API rate limits.
+        Encodes with all-MiniLM-L6-v2 in batches of 128 (better CPU cache reuse
+        than small batches) and adds each batch to ChromaDB as soon as it is ready.
         """
         # Delete existing collection to avoid duplicates on re-run
         try:
@@ -377,38 +495,42 @@ class OnboardingDataIngestor:
             metadata={
                 "description": "HR Onboarding Knowledge Base",
                 "project": "HR Onboarding Automation Agent",
-                "embedding_model": "text-embedding-3-small",
+                "embedding_model": EMBEDDING_MODEL,
                 "created": datetime.now().isoformat()
             }
         )
 
-        print(f"\n  📦 Embedding and loading {len(self.chunks)} chunks...")
-
-        # Prepare data
-        documents = [chunk['content'] for chunk in self.chunks]
-        metadatas = [chunk['metadata'] for chunk in self.chunks]
-        ids = [f"chunk_{i:04d}" for i in range(len(self.chunks))]
-
-        # Generate embeddings in batches (avoid OpenAI rate limits)
-        batch_size = 50
-        all_embeddings = []
-
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            print(f"  🔢 Embedding batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1}...")
-            batch_embeddings = self.embeddings.embed_documents(batch)
-            all_embeddings.extend(batch_embeddings)
-
-        # Load into ChromaDB in batches
-        for i in range(0, len(documents), batch_size):
-            collection.add(
-                documents=documents[i:i + batch_size],
-                embeddings=all_embeddings[i:i + batch_size],
-                metadatas=metadatas[i:i + batch_size],
-                ids=ids[i:i + batch_size]
-            )
+        print(f"\n  📦 Embedding and loading {len(self.documents)} chunks...")
+
+        documents = self.documents
+        metadatas = self.metadatas
+        ids = [f"chunk_{i:04d}" for i in range(len(documents))]
+
+        # Stream: embed a batch, write it, drop it — never hold every vector at once.
+        # A single background thread embeds batch N+1 while batch N is written.
+        batch_size = 128
+        total_batches = (len(documents) - 1) // batch_size + 1 if documents else 0
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(self.embed_with_cache, documents[:batch_size]) if documents else None
+
+            for start in range(0, len(documents), batch_size):
+                end = start + batch_size
+                batch_embeddings, n_cached, n_embedded = pending.result()
+                print(f"  🔢 Batch {start//batch_size + 1}/{total_batches}: "
+                      f"♻️  {n_cached} cached, {n_embedded} embedded")
+
+                if end < len(documents):
+                    pending = executor.submit(self.embed_with_cache, documents[end:end + batch_size])
+
+                collection.add(
+                    documents=documents[start:end],
+                    embeddings=batch_embeddings.tolist(),
+                    metadatas=metadatas[start:end],
+                    ids=ids[start:end]
+                )
 
-        print(f"\n  ✅ Successfully loaded {len(self.chunks)} chunks into 'hr_onboarding_kb'")
+        print(f"\n  ✅ Successfully loaded {len(documents)} chunks into 'hr_onboarding_kb'")
         print(f"  📊 Collection count: {collection.count()}")
 
     # ─────────────────────────────────────────────
@@ -423,9 +545,9 @@ class OnboardingDataIngestor:
         by_doc_type = {}
         by_source = {}
 
-        for chunk in self.chunks:
-            dt = chunk['metadata']['doc_type']
-            sf = chunk['metadata']['source_file']
+        for metadata in self.metadatas:
+            dt = metadata['doc_type']
+            sf = metadata['source_file']
             by_doc_type[dt] = by_doc_type.get(dt, 0) + 1
             by_source[sf] = by_source.get(sf, 0) + 1
 
@@ -437,7 +559,7 @@ class OnboardingDataIngestor:
         for sf, count in by_source.items():
             print(f"  {sf:50s} → {count} chunks")
 
-        print(f"\n  TOTAL: {len(self.chunks)} chunks")
+        print(f"\n  TOTAL: {len(self.documents)} chunks")
         print("="*50)
 
     # ─────────────────────────────────────────────
@@ -0,0 +1,228 @@
+"""
+Query Embedding Cache for HR Onboarding Knowledge Base
+Purpose:
+- Skip the MiniLM forward pass for query strings that were already embedded
+- Share one embedder between the agent tools and the retrieval test script
+- Serve ChromaDB results for paraphrased queries from a cosine-similarity cache
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.retrieval.onnx_embedder import ONNXMiniLMEmbedder, onnx_model_available
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+
+# ─────────────────────────────────────────────
+# LRU + TTL cache keyed by sha256(query)
+# ─────────────────────────────────────────────
+class LRUEmbeddingCache:
+    def __init__(self, capacity: int = 1024, ttl: float = 3600):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, vector = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ─────────────────────────────────────────────
+# Embedder wrapper with the same embed_query contract
+# ─────────────────────────────────────────────
+class CachedEmbedder:
+    def __init__(self, embeddings, cache: Optional[LRUEmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.cache = cache or LRUEmbeddingCache()
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        """Return the query embedding as a float32 array, computing it only on a cache miss."""
+        key = self.cache.key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+            self.cache.put(key, vector)
+        return vector
+
+    def embed_queries_array(self, texts: List[str]) -> np.ndarray:
+        """Embed many queries; all cache misses go through the model in one batch."""
+        if not texts:
+            return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        vectors: List[Optional[np.ndarray]] = [self.cache.get(self.cache.key(t)) for t in texts]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vectors[i] = np.asarray(vector, dtype=np.float32)
+                self.cache.put(self.cache.key(texts[i]), vectors[i])
+        return np.stack(vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_query_array(text).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def warmup(self, queries: List[str]):
+        """Pre-seed the cache in one batched model call so later lookups of these queries hit."""
+        self.embed_queries_array(queries)
+
+
+_embedder: Optional[CachedEmbedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_cached_embedder() -> CachedEmbedder:
+    """Process-wide embedder shared by src/tools/tools.py and src/retrieval/test_retrieval.py."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                # Prefer the int8 ONNX export when present; fall back to fp32 PyTorch
+                if onnx_model_available():
+                    base = ONNXMiniLMEmbedder()
+                else:
+                    # Imported here so the caches can be used without torch installed
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    base = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+                _embedder = CachedEmbedder(base)
+    return _embedder
+
+
+# ─────────────────────────────────────────────
+# Semantic cache: reuse results for near-duplicate queries
+# ─────────────────────────────────────────────
+def filter_key(metadata_filter: Optional[dict]) -> tuple:
+    """Hashable, order-independent form of a ChromaDB `where` filter (None and {} are equal)."""
+    if not metadata_filter:
+        return ()
+    return tuple(sorted((k, repr(v)) for k, v in metadata_filter.items()))
+
+
+class SemanticQueryCache:
+    """
+    Stores (query_embedding, results) pairs and returns cached results when a new
+    query is within `threshold` cosine similarity of a prior one. Entries are
+    partitioned by (metadata_filter, top_k) so a hit never crosses filters.
+    """
+
+    def __init__(self, threshold: float = 0.92, capacity: int = 512, dim: int = EMBEDDING_DIM):
+        self.threshold = threshold
+        self.capacity = capacity
+        # Fixed (capacity, dim) buffer; eviction overwrites the LRU slot in place
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._keys: List[Optional[tuple]] = [None] * capacity
+        self._payloads: list = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector: np.ndarray, key: tuple):
+        q = self._normalize(vector)
+        with self._lock:
+            if not self._size:
+                return None
+            sims = self._vectors[:self._size] @ q
+            sims[[k != key for k in self._keys[:self._size]]] = -1.0
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            self._tick += 1
+            self._last_used[best] = self._tick
+            return self._payloads[best]
+
+    def store(self, vector: np.ndarray, key: tuple, payload):
+        q = self._normalize(vector)
+        with self._lock:
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._tick += 1
+            self._vectors[slot] = q
+            self._keys[slot] = key
+            self._payloads[slot] = payload
+            self._last_used[slot] = self._tick
+
+    def clear(self):
+        with self._lock:
+            self._keys = [None] * self.capacity
+            self._payloads = [None] * self.capacity
+            self._last_used[:] = 0
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+_semantic_cache = SemanticQueryCache()
+
+
+def get_semantic_cache() -> SemanticQueryCache:
+    return _semantic_cache
+
+
+def cached_collection_query(collection, query: str, top_k: int = 3,
+                            metadata_filter: Optional[dict] = None) -> Tuple[list, list]:
+    """
+    Run collection.query for a single query string, going through both the
+    embedding cache and the semantic result cache.
+    Returns (documents, metadatas) for that query.
+    """
+    query_vector = get_cached_embedder().embed_query_array(query)
+    key = (filter_key(metadata_filter), top_k)
+
+    hit = _semantic_cache.lookup(query_vector, key)
+    if hit is not None:
+        return hit
+
+    results = collection.query(
+        query_embeddings=[query_vector.tolist()],
+        n_results=top_k,
+        where=metadata_filter
+    )
+    payload = (results["documents"][0], results["metadatas"][0])
+    _semantic_cache.store(query_vector, key, payload)
+    return payload
@@ -0,0 +1,29 @@
+"""
+Shared ChromaDB handle for HR Onboarding Knowledge Base
+Purpose:
+- Open output/chroma_db once per process, no matter how many modules query it
+- Disable anonymized telemetry on the client
+- Nothing is opened until the first get_collection() call
+"""
+
+import functools
+
+CHROMA_PATH = "output/chroma_db"
+COLLECTION_NAME = "hr_onboarding_kb"
+
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    # Deferred so importing this module (e.g. via src/tools/tools.py) doesn't load chromadb
+    import chromadb
+    from chromadb.config import Settings
+
+    return chromadb.PersistentClient(
+        path=CHROMA_PATH,
+        settings=Settings(anonymized_telemetry=False)
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_collection():
+    return get_client().get_collection(COLLECTION_NAME)
@@ -0,0 +1,72 @@
+"""
+Int8 ONNX Embedder for HR Onboarding Knowledge Base
+Purpose:
+- Run all-MiniLM-L6-v2 through onnxruntime with int8 dynamic quantization
+- Drop-in for HuggingFaceEmbeddings (embed_query / embed_documents)
+
+One-off export (writes onnx_minilm/model.onnx, then onnx_minilm/model_int8.onnx):
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 --task feature-extraction onnx_minilm/
+    python -m src.retrieval.onnx_embedder
+"""
+
+import os
+from typing import List
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    _ONNX_AVAILABLE = True
+except ImportError:
+    _ONNX_AVAILABLE = False
+
+ONNX_DIR = "onnx_minilm"
+ONNX_MODEL = f"{ONNX_DIR}/model.onnx"
+ONNX_INT8_MODEL = f"{ONNX_DIR}/model_int8.onnx"
+
+
+def onnx_model_available() -> bool:
+    """True when onnxruntime is installed and the int8 model has been exported."""
+    return _ONNX_AVAILABLE and os.path.exists(ONNX_INT8_MODEL)
+
+
+class ONNXMiniLMEmbedder:
+    def __init__(self, model_dir: str = ONNX_DIR, model_path: str = ONNX_INT8_MODEL, max_length: int = 256):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = max_length
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batch = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalize (matches sentence-transformers)
+        mask = batch["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def quantize_model(src: str = ONNX_MODEL, dst: str = ONNX_INT8_MODEL):
+    """Quantize the exported fp32 model's weights to int8."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+
+
+if __name__ == "__main__":
+    quantize_model()
+    print(f"✅ Quantized model written to {ONNX_INT8_MODEL}")
@@ -5,17 +5,15 @@ Purpose:
 - Demonstrate metadata filtering (e.g., querying only 'policy' or 'compliance' docs)
 """
 
-import chromadb
-
-from langchain.embeddings import HuggingFaceEmbeddings
+from src.retrieval.cache import cached_collection_query, filter_key, get_cached_embedder
+from src.retrieval.client import get_collection
 
 # ─────────────────────────────────────────────
 # Initialize ChromaDB and embeddings
 # ─────────────────────────────────────────────
-chroma_client = chromadb.PersistentClient(path="output/chroma_db")
-collection = chroma_client.get_collection("hr_onboarding_kb")
+collection = get_collection()
 
-embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+embeddings = get_cached_embedder()
 
 # ─────────────────────────────────────────────
 # Utility: Perform semantic query
@@ -30,45 +28,79 @@ def semantic_query(query_text: str, top_k: int = 3, metadata_filter: dict = None
     Returns:
         List of matching chunks with content & metadata
     """
-    # Embed the query
-    query_embedding = embeddings.embed_query(query_text)
-
-    # Perform ChromaDB query
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        where=metadata_filter
-    )
+    # Embed + query ChromaDB (paraphrases of earlier queries are served from cache)
+    documents, metadatas = cached_collection_query(collection, query_text, top_k, metadata_filter)
 
     # Extract content + metadata for display
     output = []
-    for doc, meta in zip(results['documents'][0], results['metadatas'][0]):
+    for doc, meta in zip(documents, metadatas):
         output.append({"content": doc, "metadata": meta})
     return output
 
+
+# ─────────────────────────────────────────────
+# Utility: Perform many semantic queries at once
+# ─────────────────────────────────────────────
+def semantic_query_batch(queries: list):
+    """
+    Args:
+        queries: List of (query_text, top_k, metadata_filter) tuples
+    Returns:
+        One result list per query (same shape as semantic_query), in input order
+
+    All query texts are embedded in a single model call. Queries sharing the
+    same top_k and metadata_filter go to ChromaDB as one multi-query request.
+    """
+    query_vectors = embeddings.embed_queries_array([q[0] for q in queries])
+
+    groups = {}
+    for idx, (_, top_k, metadata_filter) in enumerate(queries):
+        group_key = (top_k, filter_key(metadata_filter))
+        groups.setdefault(group_key, (top_k, metadata_filter, []))[2].append(idx)
+
+    output = [None] * len(queries)
+    for top_k, metadata_filter, indices in groups.values():
+        results = collection.query(
+            query_embeddings=query_vectors[indices].tolist(),
+            n_results=top_k,
+            where=metadata_filter
+        )
+        # ChromaDB returns one documents/metadatas list per query embedding
+        for idx, docs, metas in zip(indices, results['documents'], results['metadatas']):
+            output[idx] = [{"content": doc, "metadata": meta} for doc, meta in zip(docs, metas)]
+    return output
+
 # ─────────────────────────────────────────────
 # TEST QUERIES
 # ─────────────────────────────────────────────
+TEST_QUERIES = [
+    ("What are the mandatory compliance requirements?", 3, None),
+    ("Find guidance on ethical decision making", 2, {"source_file": "organization-coe.pdf"}),
+    ("Who is joining the HR department?", 3, {"doc_type": "employee_record"}),
+]
+
 if __name__ == "__main__":
+    # Seed the embedding cache in one model call; the queries below are then cache hits
+    embeddings.warmup([q[0] for q in TEST_QUERIES])
+    batch_results = semantic_query_batch(TEST_QUERIES)
+
     # 1️⃣ Basic retrieval: "What are the mandatory compliance requirements?"
     print("\n--- Test 1: Basic Compliance Query ---")
-    results = semantic_query("What are the mandatory compliance requirements?", top_k=3)
+    results = batch_results[0]
     for i, res in enumerate(results, 1):
         print(f"\nResult {i} (Source: {res['metadata']['source_file']}, Priority: {res['metadata']['priority_level']})")
         print(res['content'][:500], "...")  # print first 500 chars
 
     # 2️⃣ Metadata filtering: Only from 'organization-coe.pdf' (Ethics & Code of Conduct)
     print("\n--- Test 2: Metadata Filter (Policy Document Only) ---")
-    metadata_filter = {"source_file": "organization-coe.pdf"}
-    results = semantic_query("Find guidance on ethical decision making", top_k=2, metadata_filter=metadata_filter)
+    results = batch_results[1]
     for i, res in enumerate(results, 1):
         print(f"\nResult {i} (Source: {res['metadata']['source_file']}, Topic: {res['metadata']['topic']})")
         print(res['content'][:500], "...")
 
     # 3️⃣ Metadata filtering: Only employee records
     print("\n--- Test 3: Metadata Filter (Employee Records Only) ---")
-    metadata_filter = {"doc_type": "employee_record"}
-    results = semantic_query("Who is joining the HR department?", top_k=3, metadata_filter=metadata_filter)
+    results = batch_results[2]
     for i, res in enumerate(results, 1):
         print(f"\nResult {i} (Employee ID: {res['metadata']['employee_id']}, Role: {res['metadata']['role']})")
         print(res['content'][:500], "...")
\ No newline at end of file
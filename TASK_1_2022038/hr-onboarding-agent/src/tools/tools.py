@@ -1,16 +1,243 @@
-import chromadb
 from langchain_core.tools import tool
-from langchain_huggingface import HuggingFaceEmbeddings
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime, date
-import pandas as pd
-import json
+from typing import NamedTuple, Optional
+from collections import namedtuple
+from datetime import date
+import numpy as np
+import csv
+import functools
+import orjson
+import os
+import sys
+import time
+
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+from src.retrieval.cache import cached_collection_query
+from src.retrieval.client import get_collection
 
 # ── Shared resources ─────────────────────────
-chroma_client = chromadb.PersistentClient(path="output/chroma_db")
-collection = chroma_client.get_collection("hr_onboarding_kb")
-embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+# The Chroma collection and embedder are opened on first search (get_collection()
+# and get_cached_embedder() are process-wide singletons), not at import.
+EMPLOYEES_CSV = "data/raw/employees.csv"
+CHECKLIST_JSON = "data/checklists/onboarding_master.json"
+
+
+# Cached loaders — keyed on mtime so edits to the files still invalidate
+@functools.lru_cache(maxsize=4)
+def _load_employees(path: str, mtime: float) -> list:
+    """Parsed once per file version: row namedtuples, start_date as datetime.date."""
+    # Plain csv module — a few thousand fixed-schema rows don't need pandas
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        Row = namedtuple("EmployeeRow", [*reader.fieldnames, "is_contract"])
+        return [
+            Row(**{
+                **r,
+                "start_date": date.fromisoformat(r["start_date"]),
+                "is_contract": r["employment_type"].casefold() == "contract",
+            })
+            for r in reader
+        ]
+
+
+@functools.lru_cache(maxsize=4)
+def _load_employee_index(path: str, mtime: float) -> dict:
+    """employee_id -> row namedtuple, for O(1) point lookups."""
+    return {row.employee_id: row for row in _load_employees(path, mtime)}
+
+
+class EmployeeArrays(NamedTuple):
+    """Struct-of-arrays view of employees.csv for the scoring tools."""
+    id_to_idx: dict
+    start_days: np.ndarray   # int64 days since 1970-01-01
+    is_contract: np.ndarray  # bool
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Report templates, built once at import rather than per call
+_READY_TMPL = "Day-1 Readiness: {r}\nScore: {s}/100\nBlockers: {b}"
+_RISK_TMPL = "Risk Score: {s}/100 — {l} risk of onboarding delay"
+_NO_BLOCKERS = "None"
+
+# Interned labels; the score arrays hold references to these, not fresh strings
+READY, AT_RISK, NOT_READY = sys.intern("READY"), sys.intern("AT RISK"), sys.intern("NOT READY")
+HIGH, MEDIUM, LOW = sys.intern("HIGH"), sys.intern("MEDIUM"), sys.intern("LOW")
+
+_READINESS_LABELS = np.array([READY, AT_RISK, NOT_READY], dtype=object)
+_LEVEL_LABELS = np.array([HIGH, MEDIUM, LOW], dtype=object)
+_BLOCKER_LABELS = np.array([
+    "Very little time before start date, Start date already passed",
+    "Very little time before start date",
+    _NO_BLOCKERS,
+], dtype=object)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_employee_arrays(path: str, mtime: float) -> EmployeeArrays:
+    rows = _load_employees(path, mtime)
+    return EmployeeArrays(
+        id_to_idx={row.employee_id: i for i, row in enumerate(rows)},
+        start_days=np.fromiter((row.start_date.toordinal() - _EPOCH_ORDINAL for row in rows),
+                               dtype=np.int64, count=len(rows)),
+        is_contract=np.fromiter((row.is_contract for row in rows), dtype=bool, count=len(rows)),
+    )
+
+
+# [epoch second, date] — date.today() is recomputed at most once per second
+_today_cache = [0, None]
+
+
+def _today() -> date:
+    t = int(time.time())
+    if t != _today_cache[0]:
+        _today_cache[:] = [t, date.today()]
+    return _today_cache[1]
+
+
+def _today_days(today: date) -> int:
+    return today.toordinal() - _EPOCH_ORDINAL
+
+
+# NumPy mask arithmetic used for the cached per-day scores behind the single-ID
+# tools. Each returns integer values plus label codes into the *_LABELS arrays.
+def _readiness_codes(days):
+    # Branchless: each boolean mask contributes 0 or its weight
+    scores = 100 - 30 * (days < 3) - 50 * (days < 0)
+    return scores, np.select([scores >= 70, scores >= 40], [0, 1], 2)
+
+
+def _risk_codes(days, is_contract):
+    risk = 40 * (days <= 7) + 20 * ((days > 7) & (days <= 14)) + 10 * is_contract
+    return risk, np.select([risk >= 50, risk >= 25], [0, 1], 2)
+
+
+# Compiled equivalents for cohort scoring (score_all_employees only, so the
+# single-ID tools never pay the JIT compile). Strings stay outside the kernels.
+if _NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _readiness_kernel(days):
+        n = days.shape[0]
+        scores = np.full(n, 100, np.int64)
+        readiness_idx = np.zeros(n, np.int64)
+        for i in range(n):
+            d = days[i]
+            if d < 3:
+                scores[i] -= 30
+            if d < 0:
+                scores[i] -= 50
+            if scores[i] < 40:
+                readiness_idx[i] = 2
+            elif scores[i] < 70:
+                readiness_idx[i] = 1
+        return scores, readiness_idx
+
+    @njit(cache=True)
+    def _risk_kernel(days, is_contract):
+        n = days.shape[0]
+        risk = np.zeros(n, np.int64)
+        level_idx = np.full(n, 2, np.int64)
+        for i in range(n):
+            d = days[i]
+            if d <= 7:
+                risk[i] += 40
+            elif d <= 14:
+                risk[i] += 20
+            if is_contract[i]:
+                risk[i] += 10
+            if risk[i] >= 50:
+                level_idx[i] = 0
+            elif risk[i] >= 25:
+                level_idx[i] = 1
+        return risk, level_idx
+else:
+    _readiness_kernel, _risk_kernel = _readiness_codes, _risk_codes
+
+
+class EmployeeScores(NamedTuple):
+    """Readiness and risk for every employee, computed column-wise for one day."""
+    score: np.ndarray
+    readiness: np.ndarray
+    blockers: np.ndarray
+    risk: np.ndarray
+    level: np.ndarray
+
+
+def _build_scores(days, readiness: tuple, risk: tuple) -> EmployeeScores:
+    """Map (values, label codes) pairs from the scoring functions onto the interned labels."""
+    score, readiness_idx = readiness
+    risk_score, level_idx = risk
+    blockers = _BLOCKER_LABELS[np.select([days < 0, days < 3], [0, 1], 2)]
+    return EmployeeScores(
+        score, _READINESS_LABELS[readiness_idx], blockers, risk_score, _LEVEL_LABELS[level_idx]
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _score_employees(path: str, mtime: float, today_days: int) -> EmployeeScores:
+    """Keyed on today_days, so the cached scores roll over at midnight."""
+    employees = _load_employee_arrays(path, mtime)
+    days = employees.start_days - today_days
+    return _build_scores(days, _readiness_codes(days), _risk_codes(days, employees.is_contract))
+
+
+def score_all_employees() -> list:
+    """Readiness and risk for the whole cohort as of today, one dict per employee."""
+    employees = _load_employee_arrays(EMPLOYEES_CSV, os.path.getmtime(EMPLOYEES_CSV))
+    days = employees.start_days - _today_days(_today())
+    scores = _build_scores(days, _readiness_kernel(days), _risk_kernel(days, employees.is_contract))
+    return [
+        {
+            "employee_id": eid,
+            "readiness": scores.readiness[i],
+            "score": int(scores.score[i]),
+            "blockers": scores.blockers[i],
+            "risk": int(scores.risk[i]),
+            "level": scores.level[i],
+        }
+        for eid, i in employees.id_to_idx.items()
+    ]
+
+
+def _lookup(employee_id: str, mtime: float, today_ord: int) -> tuple:
+    """
+    Shared front half of the readiness and risk tools: (scores, row index),
+    or (None, None) for an unknown employee.
+    """
+    i = _load_employee_arrays(EMPLOYEES_CSV, mtime).id_to_idx.get(employee_id)
+    if i is None:
+        return None, None
+    return _score_employees(EMPLOYEES_CSV, mtime, today_ord - _EPOCH_ORDINAL), i
+
+
+def _lookup_batch(employee_ids: list) -> tuple:
+    """
+    Batch counterpart of _lookup: (scores gathered for the known IDs, found mask
+    over employee_ids). Scores keep input order, skipping unknown IDs.
+    """
+    mtime = os.path.getmtime(EMPLOYEES_CSV)
+    id_to_idx = _load_employee_arrays(EMPLOYEES_CSV, mtime).id_to_idx
+    idxs = np.fromiter((id_to_idx.get(e, -1) for e in employee_ids), dtype=np.int64, count=len(employee_ids))
+    found = idxs >= 0
+    scores = _score_employees(EMPLOYEES_CSV, mtime, _today_days(_today()))
+    return EmployeeScores(*(col[idxs[found]] for col in scores)), found
+
+
+@functools.lru_cache(maxsize=4)
+def _load_checklists(path: str, mtime: float) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+@functools.lru_cache(maxsize=4)
+def _load_role_index(path: str, mtime: float) -> dict:
+    """lowercase role name -> canonical role key in onboarding_master.json."""
+    return {r.lower(): r for r in _load_checklists(path, mtime)["roles"]}
 
 # =========================================================
 # TOOL 1 — Grounding (Vector Search)
@@ -23,20 +250,14 @@ class SearchKBInput(BaseModel):
 @tool(args_schema=SearchKBInput)
 def search_onboarding_knowledge(query: str, doc_type: Optional[str] = None, top_k: int = 3) -> str:
     """Search HR knowledge base for policies, tasks, or employee info."""
-    query_embedding = embeddings.embed_query(query)
     where_filter = {"doc_type": doc_type} if doc_type else None
+    documents, metadatas = cached_collection_query(get_collection(), query, top_k, where_filter)
 
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        where=where_filter
-    )
-
-    if not results["documents"][0]:
+    if not documents:
         return "No results found."
 
     output = []
-    for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
+    for doc, meta in zip(documents, metadatas):
         output.append(f"[{meta['doc_type']} | {meta['source_file']}]\n{doc}")
 
     return "\n\n---\n\n".join(output)
@@ -52,14 +273,20 @@ class ChecklistInput(BaseModel):
 @tool(args_schema=ChecklistInput)
 def generate_onboarding_checklist(role: str, department: str, start_date: str) -> str:
     """Generate onboarding checklist with deadlines and urgency."""
-    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-    today = date.today()
+    start = date.fromisoformat(start_date)
+    today = _today()
     days_until_start = (start - today).days
 
-    with open("data/checklists/onboarding_master.json") as f:
-        data = json.load(f)
+    mtime = os.path.getmtime(CHECKLIST_JSON)
+    data = _load_checklists(CHECKLIST_JSON, mtime)
+    roles = _load_role_index(CHECKLIST_JSON, mtime)
 
-    matched_role = next((r for r in data["roles"] if r.lower() in role.lower()), list(data["roles"].keys())[0])
+    # Exact role name first, then a role named inside the query, then the first role
+    key = role.strip().lower()
+    matched_role = roles.get(key) or next(
+        (orig for lc, orig in roles.items() if lc in key),
+        next(iter(roles.values()))
+    )
     tasks = data["roles"][matched_role]["tasks"]
 
     results = []
@@ -79,20 +306,17 @@ class EmployeeStatusInput(BaseModel):
 @tool(args_schema=EmployeeStatusInput)
 def get_employee_onboarding_status(employee_id: str) -> str:
     """Retrieve employee onboarding profile."""
-    df = pd.read_csv("data/raw/employees.csv")
-    df["employee_id"] = df["employee_id"].astype(str)
+    employees = _load_employee_index(EMPLOYEES_CSV, os.path.getmtime(EMPLOYEES_CSV))
 
-    emp = df[df["employee_id"] == employee_id]
-    if emp.empty:
+    row = employees.get(employee_id)
+    if row is None:
         return "Employee not found."
 
-    row = emp.iloc[0]
-    start = datetime.strptime(row["start_date"], "%Y-%m-%d").date()
-    days_until_start = (start - date.today()).days
+    days_until_start = (row.start_date - _today()).days
 
     return (
-        f"{row['first_name']} {row['last_name']} — {row['role']} ({row['department']})\n"
-        f"Start Date: {row['start_date']} ({days_until_start} days)"
+        f"{row.first_name} {row.last_name} — {row.role} ({row.department})\n"
+        f"Start Date: {row.start_date} ({days_until_start} days)"
     )
 
 # =========================================================
@@ -107,35 +331,34 @@ def evaluate_day1_readiness(employee_id: str) -> str:
     Evaluate if employee is ready for Day 1 based on start date proximity
     and checklist urgency.
     """
-    df = pd.read_csv("data/raw/employees.csv")
-    df["employee_id"] = df["employee_id"].astype(str)
-    emp = df[df["employee_id"] == employee_id]
+    return _readiness_report(employee_id, os.path.getmtime(EMPLOYEES_CSV), _today().toordinal())
 
-    if emp.empty:
-        return "Employee not found."
-
-    row = emp.iloc[0]
-    start = datetime.strptime(row["start_date"], "%Y-%m-%d").date()
-    days_until_start = (start - date.today()).days
 
-    score = 100
-    blockers = []
+# Output is constant per (employee, file version, day) — memoize the final string
+@functools.lru_cache(maxsize=4096)
+def _readiness_report(employee_id: str, mtime: float, today_ord: int) -> str:
+    scores, i = _lookup(employee_id, mtime, today_ord)
 
-    if days_until_start < 3:
-        score -= 30
-        blockers.append("Very little time before start date")
+    if scores is None:
+        return "Employee not found."
 
-    if days_until_start < 0:
-        score -= 50
-        blockers.append("Start date already passed")
+    return _READY_TMPL.format(r=scores.readiness[i], s=int(scores.score[i]), b=scores.blockers[i])
 
-    readiness = "READY" if score >= 70 else "AT RISK" if score >= 40 else "NOT READY"
+class ReadinessBatchInput(BaseModel):
+    employee_ids: list[str]
 
-    return (
-        f"Day-1 Readiness: {readiness}\n"
-        f"Score: {score}/100\n"
-        f"Blockers: {', '.join(blockers) if blockers else 'None'}"
+@tool(args_schema=ReadinessBatchInput)
+def evaluate_day1_readiness_batch(employee_ids: list[str]) -> list[str]:
+    """
+    Evaluate Day-1 readiness for several employees in one call.
+    Returns one report per employee ID, in input order.
+    """
+    scores, found = _lookup_batch(employee_ids)
+    reports = iter(
+        _READY_TMPL.format(r=r, s=int(s), b=b)
+        for r, s, b in zip(scores.readiness, scores.score, scores.blockers)
     )
+    return [next(reports) if ok else "Employee not found." for ok in found]
 
 # =========================================================
 # TOOL 5 — Risk Score Calculator ⭐
@@ -149,27 +372,31 @@ def calculate_onboarding_risk(employee_id: str) -> str:
     Calculate onboarding delay risk score (0–100).
     Higher = greater risk.
     """
-    df = pd.read_csv("data/raw/employees.csv")
-    df["employee_id"] = df["employee_id"].astype(str)
-    emp = df[df["employee_id"] == employee_id]
+    return _risk_report(employee_id, os.path.getmtime(EMPLOYEES_CSV), _today().toordinal())
 
-    if emp.empty:
-        return "Employee not found."
 
-    row = emp.iloc[0]
-    start = datetime.strptime(row["start_date"], "%Y-%m-%d").date()
-    days_until_start = (start - date.today()).days
+@functools.lru_cache(maxsize=4096)
+def _risk_report(employee_id: str, mtime: float, today_ord: int) -> str:
+    scores, i = _lookup(employee_id, mtime, today_ord)
 
-    risk = 0
+    if scores is None:
+        return "Employee not found."
 
-    if days_until_start <= 7:
-        risk += 40
-    elif days_until_start <= 14:
-        risk += 20
+    return _RISK_TMPL.format(s=int(scores.risk[i]), l=scores.level[i])
 
-    if row["employment_type"].lower() == "contract":
-        risk += 10
 
-    level = "HIGH" if risk >= 50 else "MEDIUM" if risk >= 25 else "LOW"
+class RiskBatchInput(BaseModel):
+    employee_ids: list[str]
 
-    return f"Risk Score: {risk}/100 — {level} risk of onboarding delay"
\ No newline at end of file
+@tool(args_schema=RiskBatchInput)
+def calculate_onboarding_risk_batch(employee_ids: list[str]) -> list[str]:
+    """
+    Calculate onboarding delay risk scores for several employees in one call.
+    Returns one report per employee ID, in input order.
+    """
+    scores, found = _lookup_batch(employee_ids)
+    reports = iter(
+        _RISK_TMPL.format(s=int(risk), l=level)
+        for risk, level in zip(scores.risk, scores.level)
+    )
+    return [next(reports) if ok else "Employee not found." for ok in found]
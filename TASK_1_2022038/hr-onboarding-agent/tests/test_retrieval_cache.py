@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from src.retrieval import cache as cache_module
+from src.retrieval.cache import (
+    EMBEDDING_DIM,
+    CachedEmbedder,
+    LRUEmbeddingCache,
+    SemanticQueryCache,
+    filter_key,
+)
+
+
+class FakeEmbeddings:
+    """Deterministic stand-in for HuggingFaceEmbeddings that records model calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t))] * EMBEDDING_DIM for t in texts]
+
+
+def test_filter_key_ignores_order_and_empty_filters():
+    assert filter_key(None) == filter_key({}) == ()
+    assert filter_key({"a": 1, "b": "x"}) == filter_key({"b": "x", "a": 1})
+    assert filter_key({"a": 1}) != filter_key({"a": "1"})
+
+
+def test_embed_queries_array_empty():
+    fake = FakeEmbeddings()
+    vectors = CachedEmbedder(fake).embed_queries_array([])
+    assert vectors.shape == (0, EMBEDDING_DIM)
+    assert fake.calls == []
+
+
+def test_warmup_batches_misses_and_seeds_cache():
+    fake = FakeEmbeddings()
+    embedder = CachedEmbedder(fake)
+    embedder.warmup([])
+    embedder.warmup(["a", "bb"])
+    embedder.embed_query("bb")
+    embedder.embed_queries_array(["a", "ccc"])
+    assert fake.calls == [["a", "bb"], ["ccc"]]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_cache_expires_after_ttl(clock):
+    cache = LRUEmbeddingCache(capacity=4, ttl=10)
+    cache.put("a", np.ones(2))
+    clock[0] += 10
+    assert cache.get("a") is not None
+    clock[0] += 0.5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_evicts_least_recently_used(clock):
+    cache = LRUEmbeddingCache(capacity=2)
+    cache.put("a", np.ones(2))
+    cache.put("b", np.ones(2))
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", np.ones(2))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def _unit(*components):
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vector[:len(components)] = components
+    return vector
+
+
+KEY = (filter_key(None), 3)
+
+
+def test_semantic_cache_threshold_hit_and_miss():
+    cache = SemanticQueryCache(threshold=0.92, capacity=4)
+    cache.store(_unit(1.0, 0.0), KEY, "payload")
+    assert cache.lookup(_unit(1.0, 0.1), KEY) == "payload"   # cos ~0.995
+    assert cache.lookup(_unit(1.0, 0.5), KEY) is None        # cos ~0.894
+    assert cache.lookup(_unit(0.0, 1.0), KEY) is None
+
+
+def test_semantic_cache_never_crosses_filter_or_top_k():
+    cache = SemanticQueryCache(capacity=4)
+    cache.store(_unit(1.0), KEY, "unfiltered top 3")
+    assert cache.lookup(_unit(1.0), (filter_key({"doc_type": "policy"}), 3)) is None
+    assert cache.lookup(_unit(1.0), (filter_key(None), 5)) is None
+    assert cache.lookup(_unit(1.0), (filter_key({}), 3)) == "unfiltered top 3"
+
+
+def test_semantic_cache_overwrites_least_recently_used_slot():
+    cache = SemanticQueryCache(capacity=2)
+    cache.store(_unit(1.0, 0.0, 0.0), KEY, "a")
+    cache.store(_unit(0.0, 1.0, 0.0), KEY, "b")
+    assert cache.lookup(_unit(1.0, 0.0, 0.0), KEY) == "a"  # "b" is now least recently used
+    cache.store(_unit(0.0, 0.0, 1.0), KEY, "c")
+    assert len(cache) == 2
+    assert cache.lookup(_unit(0.0, 1.0, 0.0), KEY) is None
+    assert cache.lookup(_unit(1.0, 0.0, 0.0), KEY) == "a"
+    assert cache.lookup(_unit(0.0, 0.0, 1.0), KEY) == "c"
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.lookup(_unit(1.0, 0.0, 0.0), KEY) is None
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import src.tools.tools as tools
+
+
+@pytest.fixture(scope="module")
+def days_and_contract():
+    # Both sides of every threshold (0, 3, 7, 14), each as contract and non-contract
+    days = np.repeat(np.arange(-5, 21, dtype=np.int64), 2)
+    is_contract = np.tile(np.array([False, True]), days.shape[0] // 2)
+    return days, is_contract
+
+
+def test_numba_kernels_match_numpy(days_and_contract):
+    pytest.importorskip("numba")
+    days, is_contract = days_and_contract
+
+    for jitted, reference in (
+        (tools._readiness_kernel(days), tools._readiness_codes(days)),
+        (tools._risk_kernel(days, is_contract), tools._risk_codes(days, is_contract)),
+    ):
+        for got, expected in zip(jitted, reference):
+            np.testing.assert_array_equal(got, expected)
+
+
+SHORT = "Very little time before start date"
+PASSED = "Very little time before start date, Start date already passed"
+
+# days, is_contract -> score, readiness, blockers, risk, level (the original if/else ladder)
+EXPECTED_SCORES = [
+    (-1, False, 20, "NOT READY", PASSED, 40, "MEDIUM"),
+    (-1, True, 20, "NOT READY", PASSED, 50, "HIGH"),
+    (0, False, 70, "READY", SHORT, 40, "MEDIUM"),
+    (0, True, 70, "READY", SHORT, 50, "HIGH"),
+    (2, False, 70, "READY", SHORT, 40, "MEDIUM"),
+    (2, True, 70, "READY", SHORT, 50, "HIGH"),
+    (3, False, 100, "READY", "None", 40, "MEDIUM"),
+    (3, True, 100, "READY", "None", 50, "HIGH"),
+    (7, False, 100, "READY", "None", 40, "MEDIUM"),
+    (7, True, 100, "READY", "None", 50, "HIGH"),
+    (8, False, 100, "READY", "None", 20, "LOW"),
+    (8, True, 100, "READY", "None", 30, "MEDIUM"),
+    (14, False, 100, "READY", "None", 20, "LOW"),
+    (14, True, 100, "READY", "None", 30, "MEDIUM"),
+    (15, False, 100, "READY", "None", 0, "LOW"),
+    (15, True, 100, "READY", "None", 10, "LOW"),
+]
+
+
+def test_scores_match_expected_table():
+    days = np.array([row[0] for row in EXPECTED_SCORES], dtype=np.int64)
+    is_contract = np.array([row[1] for row in EXPECTED_SCORES])
+    scores = tools._build_scores(days, tools._readiness_codes(days), tools._risk_codes(days, is_contract))
+
+    got = list(zip(days.tolist(), is_contract.tolist(), scores.score.tolist(), scores.readiness,
+                   scores.blockers, scores.risk.tolist(), scores.level))
+    assert got == EXPECTED_SCORES
+
+@pytest.fixture(scope="module")
+def known_ids():
+    return list(tools._load_employee_index(tools.EMPLOYEES_CSV, tools.os.path.getmtime(tools.EMPLOYEES_CSV)))
+
+
+@pytest.mark.parametrize("batch_tool, single_tool", [
+    (tools.evaluate_day1_readiness_batch, tools.evaluate_day1_readiness),
+    (tools.calculate_onboarding_risk_batch, tools.calculate_onboarding_risk),
+])
+class TestBatchTools:
+    def test_matches_single_id_tool(self, batch_tool, single_tool, known_ids):
+        result = batch_tool.invoke({"employee_ids": known_ids})
+        assert result == [single_tool.invoke({"employee_id": e}) for e in known_ids]
+
+    def test_mixed_known_and_unknown_ids(self, batch_tool, single_tool, known_ids):
+        ids = ["EMP9999", known_ids[0], "", known_ids[-1], "EMP0000"]
+        result = batch_tool.invoke({"employee_ids": ids})
+        assert result == [single_tool.invoke({"employee_id": e}) for e in ids]
+        assert [r == "Employee not found." for r in result] == [True, False, True, False, True]
+
+    def test_empty_list(self, batch_tool, single_tool):
+        assert batch_tool.invoke({"employee_ids": []}) == []
+
+    def test_duplicate_ids(self, batch_tool, single_tool, known_ids):
+        ids = [known_ids[0], "EMP9999", known_ids[0], known_ids[0]]
+        result = batch_tool.invoke({"employee_ids": ids})
+        assert result == [single_tool.invoke({"employee_id": e}) for e in ids]